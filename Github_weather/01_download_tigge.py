@@ -9,9 +9,64 @@ Requires ECMWF API access (https://api.ecmwf.int/v1/key/)
 """
 
 from ecmwfapi import ECMWFDataServer
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import time
 from datetime import datetime
 
+import pandas as pd
+import xarray as xr
+
+# Concurrent requests; keep <= 5 per ECMWF fair-use guidance
+MAX_WORKERS = 5
+MAX_RETRIES = 3
+
+def retrieve_with_retry(server, request, retries=MAX_RETRIES):
+    """Retrieve one request, retrying with exponential backoff"""
+    for attempt in range(retries):
+        try:
+            return server.retrieve(request)
+        except Exception:
+            if attempt == retries - 1:
+                raise
+            time.sleep(2 ** attempt * 10)
+
+def grib_to_parquet(filepath, storm_name, origin):
+    """
+    Convert a TIGGE GRIB file to long-form columnar Parquet
+    
+    The output keeps the full grid; extract the storm location
+    (02_extract_forecasts.py) before using it as input to 03_calculate_bci.py.
+    
+    Parameters:
+    -----------
+    filepath : str
+        Downloaded GRIB file
+    storm_name : str
+        Storm name stored as a dictionary-encoded column
+    origin : str
+        Model origin code
+        
+    Returns:
+    --------
+    parquet_path : str
+        Path of the written Parquet file
+    """
+    with xr.open_dataset(filepath, engine='cfgrib') as ds:
+        df = ds['t2m'].to_dataframe().reset_index()
+    
+    df = df.rename(columns={'number': 'member'})
+    df['temperature'] = (df.pop('t2m') - 273.15).astype('float32')  # K -> °C
+    df['storm'] = pd.Categorical([storm_name] * len(df))
+    df['origin'] = pd.Categorical([origin] * len(df))
+    df = df[['storm', 'origin', 'member', 'time', 'step', 'valid_time',
+             'latitude', 'longitude', 'temperature']]
+    
+    parquet_path = os.path.splitext(filepath)[0] + '.parquet'
+    df.to_parquet(parquet_path, engine='pyarrow', compression='zstd',
+                  use_dictionary=True, index=False)
+    return parquet_path
+
 def download_tigge_storms():
     """Download TIGGE data for 14 UK extratropical cyclones"""
     
@@ -48,44 +103,65 @@ def download_tigge_storms():
     os.makedirs(output_dir, exist_ok=True)
     
     total = len(storms) * len(origins)
-    completed = 0
     
+    # Build all requests up front
+    jobs = []
     for storm in storms:
-        print(f"\n{storm['name']} ({storm['dates']})...")
-        
         for origin in origins:
-            completed += 1
             filepath = os.path.join(output_dir, f"{storm['name'].lower()}_{origin}.grib")
-            
-            print(f"  [{completed}/{total}] {origin.upper()}...", end='')
+            request = {
+                'class': 'ti',              # TIGGE class
+                'dataset': 'tigge',
+                'date': storm['dates'],
+                'expver': 'prod',
+                'levtype': 'sfc',           # Surface level
+                'origin': origin,            # Model origin code
+                'param': '2t',              # 2m temperature
+                'step': '0/6/12/18/24',     # Forecast lead times
+                'time': '00:00:00/06:00:00/12:00:00/18:00:00',  # Init times
+                'type': 'pf',               # Perturbed forecasts (ensemble)
+                'number': '1/2/3/4/5/6/7/8/9/10',  # First 10 members
+                'grid': '0.25/0.25',        # 0.25 degree resolution
+                'area': '53/-2/52/-1',      # UK region (lat/lon bounds)
+                'target': filepath,
+                'expect': 'any'             # Accept any number of fields
+            }
+            jobs.append((storm, origin, filepath, request))
+    
+    print(f"\nSubmitting {total} requests ({MAX_WORKERS} concurrent)...")
+    
+    # Overlap server queueing across a bounded pool of requests
+    completed = 0
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(retrieve_with_retry, server, request): (storm, origin, filepath)
+            for storm, origin, filepath, request in jobs
+        }
+        
+        for future in as_completed(futures):
+            storm, origin, filepath = futures[future]
+            completed += 1
+            label = f"  [{completed}/{total}] {storm['name']} {origin.upper()}..."
             
             try:
-                server.retrieve({
-                    'class': 'ti',              # TIGGE class
-                    'dataset': 'tigge',
-                    'date': storm['dates'],
-                    'expver': 'prod',
-                    'levtype': 'sfc',           # Surface level
-                    'origin': origin,            # Model origin code
-                    'param': '2t',              # 2m temperature
-                    'step': '0/6/12/18/24',     # Forecast lead times
-                    'time': '00:00:00/06:00:00/12:00:00/18:00:00',  # Init times
-                    'type': 'pf',               # Perturbed forecasts (ensemble)
-                    'number': '1/2/3/4/5/6/7/8/9/10',  # First 10 members
-                    'grid': '0.25/0.25',        # 0.25 degree resolution
-                    'area': '53/-2/52/-1',      # UK region (lat/lon bounds)
-                    'target': filepath,
-                    'expect': 'any'             # Accept any number of fields
-                })
+                future.result()
                 
                 if os.path.exists(filepath):
                     size_mb = os.path.getsize(filepath) / (1024 * 1024)
-                    print(f" ✓ {size_mb:.1f} MB")
+                    print(f"{label} ✓ {size_mb:.1f} MB")
                 else:
-                    print(" ✗ Failed")
+                    print(f"{label} ✗ Failed")
+                    continue
                     
             except Exception as e:
-                print(f" ✗ Error: {e}")
+                print(f"{label} ✗ Error: {e}")
+                continue
+            
+            # Columnar copy for fast downstream scans
+            try:
+                grib_to_parquet(filepath, storm['name'], origin)
+            except Exception as e:
+                print(f"    ✗ Parquet conversion failed: {e}")
     
     print("\n" + "="*80)
     print("DOWNLOAD COMPLETE")
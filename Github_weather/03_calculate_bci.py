@@ -12,6 +12,11 @@ BCI = √(φ × ρ) where:
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pa_parquet
+
+from bci_kernels import phi_kernel, rho_kernel, bci_kernel, calculate_bci_batch
 
 def calculate_bci_component_phi(ensemble_members, observation):
     """
@@ -31,28 +36,8 @@ def calculate_bci_component_phi(ensemble_members, observation):
     phi : float
         Bias consensus score [0.3, 1.0]
     """
-    biases = ensemble_members - observation
-    
-    # Directional agreement
-    n_positive = np.sum(biases > 0)
-    n_negative = np.sum(biases < 0)
-    directional_agreement = max(n_positive, n_negative) / len(biases)
-    
-    # Magnitude consistency
-    bias_std = np.std(biases)
-    bias_mean = np.abs(np.mean(biases))
-    
-    if bias_mean > 0.01:
-        cv = bias_std / bias_mean
-        magnitude_consistency = 1 / (1 + cv)
-    else:
-        magnitude_consistency = 0.8  # Default for near-zero bias
-    
-    # Combined phi
-    phi = 0.5 * directional_agreement + 0.5 * magnitude_consistency
-    phi = np.clip(phi, 0.3, 1.0)
-    
-    return phi
+    members = np.asarray(ensemble_members, dtype=np.float64)
+    return phi_kernel(members, float(observation))
 
 def calculate_bci_component_rho(spread, error):
     """
@@ -72,14 +57,7 @@ def calculate_bci_component_rho(spread, error):
     rho : float
         Stability score [0.3, 1.0]
     """
-    if error > 0.1:
-        spread_skill_ratio = min(spread / error, 1.0)
-    else:
-        spread_skill_ratio = 1.0
-    
-    rho = np.clip(spread_skill_ratio, 0.3, 1.0)
-    
-    return rho
+    return rho_kernel(float(spread), float(error))
 
 def calculate_bci(ensemble_members, observation, spread=None, error=None):
     """
@@ -105,21 +83,98 @@ def calculate_bci(ensemble_members, observation, spread=None, error=None):
     rho : float
         Rho component
     """
-    # Calculate phi from ensemble-observation relationship
-    phi = calculate_bci_component_phi(ensemble_members, observation)
+    members = np.asarray(ensemble_members, dtype=np.float64)
     
-    # Calculate rho from spread-error relationship
+    # Default rho inputs from the ensemble itself
     if spread is None:
-        spread = np.std(ensemble_members)
+        spread = np.std(members)
     if error is None:
-        error = np.abs(np.mean(ensemble_members) - observation)
+        error = np.abs(np.mean(members) - observation)
+    
+    # BCI is geometric mean of phi and rho
+    return bci_kernel(members, float(observation), float(spread), float(error))
+
+# Arrow types for forecast table columns (storm is dictionary-encoded).
+# Temperatures stay float64: BCI thresholds (bias > 0.01, error > 0.1) sit on
+# values float32 cannot represent, and pass-through columns feed 04_validation
+COLUMN_TYPES = {
+    'storm': pa.dictionary(pa.int32(), pa.string()),
+    'valid_time': pa.timestamp('ns'),
+    'temperature': pa.float64(),
+    'obs_temperature': pa.float64(),
+    'model_mean': pa.float64(),
+    'model_std': pa.float64(),
+    'mean_error': pa.float64(),
+}
+
+def _read_csv_table(path, columns, schema):
+    """
+    Parse a forecast CSV with the multi-threaded Arrow reader and a fixed schema
+    
+    valid_time may be naive ('2021-11-26 06:00:00', taken as UTC) or carry a zone
+    suffix ('2021-11-26T06:00:00Z', '+01:00'); zoned times are converted to UTC
+    and the zone is dropped by the final cast in load_forecasts.
+    """
+    time_index = schema.get_field_index('valid_time')
+    utc_schema = schema.set(time_index, pa.field('valid_time', pa.timestamp('ns', tz='UTC')))
+    
+    errors = []
+    for column_types in (schema, utc_schema):
+        try:
+            return pa_csv.read_csv(path, convert_options=pa_csv.ConvertOptions(
+                include_columns=columns,
+                column_types=column_types
+            ))
+        except pa.ArrowInvalid as e:
+            # Only valid_time is a timestamp column; other conversion errors
+            # are not a zone problem, so report them as they are
+            if 'timestamp' not in str(e):
+                raise
+            errors.append(e)
     
-    rho = calculate_bci_component_rho(spread, error)
+    raise ValueError(
+        f"Could not parse {path}: valid_time must be ISO 8601 timestamps, either "
+        f"all without a zone or all with one (e.g. '2021-11-26 06:00:00' or "
+        f"'2021-11-26T06:00:00Z'). Naive parse: {errors[0]} UTC parse: {errors[1]}"
+    ) from errors[-1]
+
+def load_forecasts(path, columns):
+    """
+    Load forecast table from CSV or Parquet, reading only the needed columns
+    
+    Parameters:
+    -----------
+    path : str
+        CSV or Parquet (.parquet) file with point-extracted forecasts
+        (one location per storm, as written by 02_extract_forecasts.py);
+        gridded Parquet from 01_download_tigge.py is rejected
+    columns : list of str
+        Columns to load; must include 'valid_time'
+        
+    Returns:
+    --------
+    df : DataFrame
+        Forecast table typed per COLUMN_TYPES
+    """
+    schema = pa.schema([(c, COLUMN_TYPES[c]) for c in columns])
     
-    # BCI is geometric mean
-    bci = np.sqrt(phi * rho)
+    if str(path).endswith('.parquet'):
+        # Members are grouped by (storm, valid_time) only, so a gridded table
+        # would pool every grid point into a single ensemble
+        location = ['storm', 'latitude', 'longitude']
+        if set(location) <= set(pa_parquet.read_schema(path).names):
+            points = pa_parquet.read_table(path, columns=location).to_pandas()
+            if points.drop_duplicates()['storm'].duplicated().any():
+                raise ValueError(
+                    f"{path} holds more than one grid point per storm; extract "
+                    f"the storm location first (02_extract_forecasts.py)"
+                )
+        table = pa_parquet.read_table(path, columns=columns)
+    else:
+        table = _read_csv_table(path, columns, schema)
     
-    return bci, phi, rho
+    # Identical key types in every table keep the group lookup on the fast hash path
+    return table.select(columns).cast(schema).to_pandas()
 
 def process_validation_data(matched_forecasts_file, ensemble_forecasts_file, output_file):
     """
@@ -128,9 +183,9 @@ def process_validation_data(matched_forecasts_file, ensemble_forecasts_file, out
     Parameters:
     -----------
     matched_forecasts_file : str
-        CSV with matched forecast-observation pairs
+        CSV or Parquet with matched forecast-observation pairs
     ensemble_forecasts_file : str
-        CSV with individual ensemble member forecasts
+        CSV or Parquet with individual ensemble member forecasts
     output_file : str
         Output CSV path
     """
@@ -139,50 +194,87 @@ def process_validation_data(matched_forecasts_file, ensemble_forecasts_file, out
     print("="*80)
     
     # Load data
-    matched_df = pd.read_csv(matched_forecasts_file)
-    ensemble_df = pd.read_csv(ensemble_forecasts_file)
-    
-    ensemble_df['valid_time'] = pd.to_datetime(ensemble_df['valid_time'])
-    matched_df['valid_time'] = pd.to_datetime(matched_df['valid_time'])
+    matched_df = load_forecasts(matched_forecasts_file, [
+        'storm', 'valid_time', 'obs_temperature',
+        'model_mean', 'model_std', 'mean_error'
+    ])
+    ensemble_df = load_forecasts(ensemble_forecasts_file, [
+        'storm', 'valid_time', 'temperature'
+    ])
     
     print(f"\nProcessing {len(matched_df)} timesteps...")
     
-    results = []
+    # Records without a valid_time can never match (merge_asof rejects null keys)
+    matched_df = matched_df.dropna(subset=['valid_time']).reset_index(drop=True)
+    ensemble_df = ensemble_df.dropna(subset=['valid_time'])
     
-    for idx, row in matched_df.iterrows():
-        storm = row['storm']
-        vt = row['valid_time']
-        obs = row['obs_temperature']
-        spread = row['model_std']
-        error = row['mean_error']
-        
-        # Get ensemble members
-        members = ensemble_df[
-            (ensemble_df['storm'] == storm) &
-            (ensemble_df['valid_time'] == vt)
-        ]['temperature'].values
-        
-        if len(members) < 4:
-            continue
-        
-        # Calculate BCI
-        bci, phi, rho = calculate_bci(members, obs, spread, error)
-        
-        results.append({
-            'storm': storm,
-            'valid_time': vt,
-            'obs_temperature': obs,
-            'model_mean': row['model_mean'],
-            'model_std': spread,
-            'mean_error': error,
-            'phi': phi,
-            'rho': rho,
-            'BCI': bci,
-            'n_members': len(members)
-        })
+    keys = ['storm', 'valid_time']
+    
+    # merge_asof needs identical categorical 'by' keys on both sides
+    storms = matched_df['storm'].cat.categories.union(ensemble_df['storm'].cat.categories)
+    for df in (matched_df, ensemble_df):
+        df['storm'] = df['storm'].cat.set_categories(storms)
+    
+    # Snap each member's valid_time onto the nearest matched time of the same
+    # storm, tolerating small valid_time drift between the two files
+    matched_times = matched_df[keys].drop_duplicates().sort_values('valid_time', kind='stable')
+    snapped = pd.merge_asof(
+        ensemble_df[keys + ['temperature']].sort_values('valid_time', kind='stable'),
+        matched_times.assign(matched_time=matched_times['valid_time']),
+        on='valid_time',
+        by='storm',
+        tolerance=pd.Timedelta('1min'),
+        direction='nearest'
+    ).dropna(subset=['matched_time'])
+    
+    # Exact join back to matched rows, so repeated keys each get all members
+    rows_df = matched_df[keys].reset_index().rename(
+        columns={'index': 'row', 'valid_time': 'matched_time'}
+    )
+    joined = snapped[['storm', 'matched_time', 'temperature']].merge(
+        rows_df, on=['storm', 'matched_time']
+    )
+    
+    # Matched row and within-row slot of every member
+    member_row = joined['row'].to_numpy(dtype=np.int64)
+    member_slot = joined.groupby(member_row).cumcount().to_numpy()
+    sizes = np.bincount(member_row, minlength=len(matched_df))
+    
+    # Skip timesteps with fewer than 4 members
+    rows = np.flatnonzero(sizes >= 4)
+    n_members = sizes[rows].astype(np.int16)
+    
+    # Scatter all members into a contiguous, padded (n_rows, n_members) block
+    row_pos = np.full(len(matched_df), -1)
+    row_pos[rows] = np.arange(len(rows))
+    keep = row_pos[member_row] >= 0
+    members = np.full((len(rows), n_members.max()), np.nan)
+    members[row_pos[member_row[keep]], member_slot[keep]] = joined['temperature'].to_numpy()[keep]
+    
+    results_df = matched_df.iloc[rows][[
+        'storm', 'valid_time', 'obs_temperature',
+        'model_mean', 'model_std', 'mean_error'
+    ]].reset_index(drop=True)
+    
+    # One fused compiled call over all timesteps
+    phi = np.empty(len(rows))
+    rho = np.empty(len(rows))
+    bci = np.empty(len(rows))
+    calculate_bci_batch(
+        members,
+        n_members,
+        results_df['obs_temperature'].to_numpy(dtype=np.float64),
+        results_df['model_std'].to_numpy(dtype=np.float64),
+        results_df['mean_error'].to_numpy(dtype=np.float64),
+        phi, rho, bci
+    )
+    
+    results_df['phi'] = phi
+    results_df['rho'] = rho
+    results_df['BCI'] = bci
+    results_df['n_members'] = n_members
     
     # Save results
-    results_df = pd.DataFrame(results)
     results_df.to_csv(output_file, index=False)
     
     print(f"\n✓ BCI calculated for {len(results_df)} timesteps")
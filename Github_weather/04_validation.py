@@ -9,23 +9,57 @@ Validates BCI performance and compares against baseline methods.
 
 import pandas as pd
 import numpy as np
-from scipy.stats import pearsonr
+from scipy.stats import t as t_dist
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score, confusion_matrix
 from sklearn.preprocessing import StandardScaler
 
+def make_classifier():
+    """
+    Logistic regression shared by the baseline models on normalised features
+    
+    liblinear is the fastest solver for small binary problems; the large
+    intercept scaling keeps its penalised intercept close to an unpenalised fit.
+    """
+    return LogisticRegression(solver='liblinear', intercept_scaling=100,
+                              random_state=42, max_iter=1000)
+
+def correlation_pvalue(r, n):
+    """
+    Two-sided p-value for a Pearson correlation r from n samples
+    """
+    t_stat = r * np.sqrt((n - 2) / (1 - r**2))
+    return 2 * t_dist.sf(np.abs(t_stat), n - 2)
+
 def partial_correlation(x, y, control):
     """
     Calculate partial correlation between x and y, controlling for z
     """
-    # Residualize x and y against control
-    x_resid = x - np.polyval(np.polyfit(control, x, 1), control)
-    y_resid = y - np.polyval(np.polyfit(control, y, 1), control)
+    # All three pairwise correlations in one pass
+    corr = np.corrcoef([x, y, control])
+    r_xy, r_xz, r_yz = corr[0, 1], corr[0, 2], corr[1, 2]
     
-    # Correlation of residuals
-    r, p = pearsonr(x_resid, y_resid)
+    # Closed-form first-order partial correlation
+    r = (r_xy - r_xz * r_yz) / np.sqrt((1 - r_xz**2) * (1 - r_yz**2))
+    
+    # Two-sided p-value, as for the correlation of residuals
+    p = correlation_pvalue(r, len(x))
     return r, p
 
+def group_mean_std(values, codes, n_groups):
+    """
+    NaN-aware per-group mean and sample std over integer group codes
+    """
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = np.bincount(codes, minlength=n_groups)
+        mean = np.bincount(codes, weights=values, minlength=n_groups) / n
+        sq_dev = np.bincount(codes, weights=(values - mean[codes])**2, minlength=n_groups)
+        std = np.sqrt(sq_dev / (n - 1))
+    return mean, std
+
 def validate_bci(bci_data_file):
     """
     Run statistical validation on BCI results
@@ -50,8 +84,9 @@ def validate_bci(bci_data_file):
     print("CORRELATION ANALYSIS")
     print('='*80)
     
-    corr_spread, p_spread = pearsonr(df['model_std'], df['mean_error'])
-    corr_bci, p_bci = pearsonr(df['BCI'], df['mean_error'])
+    corr = np.corrcoef(df[['model_std', 'BCI', 'mean_error']].to_numpy().T)
+    corr_spread, p_spread = corr[0, 2], correlation_pvalue(corr[0, 2], len(df))
+    corr_bci, p_bci = corr[1, 2], correlation_pvalue(corr[1, 2], len(df))
     
     print(f"\nCorrelation with forecast error:")
     print(f"  Ensemble spread: r = {corr_spread:.3f}, p = {p_spread:.6f}")
@@ -81,31 +116,44 @@ def validate_bci(bci_data_file):
     print("PER-STORM STATISTICS")
     print('='*80)
     
-    storm_stats = df.groupby('storm').agg({
-        'BCI': ['mean', 'std'],
-        'model_std': 'mean',
-        'mean_error': 'mean',
-        'valid_time': 'count'
-    }).round(3)
-    storm_stats.columns = ['BCI_mean', 'BCI_std', 'Spread', 'Error', 'N']
+    codes, storms = pd.factorize(df['storm'], sort=True)
+    n_storms = len(storms)
+    
+    bci_mean, bci_std = group_mean_std(df['BCI'].to_numpy(dtype=float), codes, n_storms)
+    spread, _ = group_mean_std(df['model_std'].to_numpy(dtype=float), codes, n_storms)
+    error, _ = group_mean_std(df['mean_error'].to_numpy(dtype=float), codes, n_storms)
+    counts = np.bincount(codes[(codes >= 0) & df['valid_time'].notna().to_numpy()],
+                         minlength=n_storms)
+    
+    storm_stats = pd.DataFrame({
+        'BCI_mean': bci_mean,
+        'BCI_std': bci_std,
+        'Spread': spread,
+        'Error': error,
+        'N': counts
+    }, index=pd.Index(storms, name='storm')).round(3)
     print(f"\n{storm_stats.sort_values('N', ascending=False)}")
     
     return df
 
-def baseline_comparison(bci_data_file):
+def baseline_comparison(bci_data):
     """
     Compare BCI against baseline approaches
     
     Parameters:
     -----------
-    bci_data_file : str
-        CSV file with BCI calculations
+    bci_data : str or DataFrame
+        CSV file with BCI calculations, or the already-loaded DataFrame
+        (e.g. as returned by validate_bci)
     """
     print("\n" + "="*80)
     print("BASELINE COMPARISON")
     print("="*80)
     
-    df = pd.read_csv(bci_data_file)
+    if isinstance(bci_data, pd.DataFrame):
+        df = bci_data.copy()
+    else:
+        df = pd.read_csv(bci_data)
     
     # Define high-error events (top 25%)
     error_threshold = df['mean_error'].quantile(0.75)
@@ -115,13 +163,12 @@ def baseline_comparison(bci_data_file):
     print(f"High-error events: {df['high_error'].sum()} / {len(df)} ({df['high_error'].sum()/len(df)*100:.1f}%)")
     
     # Prepare features
-    X_spread = df[['model_std']].values
-    X_bci = df[['BCI']].values
-    X_combined = df[['model_std', 'BCI']].values
+    X_combined = df[['model_std', 'BCI']].to_numpy()
     
-    # Normalize for equal weighting
-    scaler = StandardScaler()
-    X_combined_norm = scaler.fit_transform(X_combined)
+    # Normalize once for equal weighting; single-feature models use its columns
+    X_combined_norm = StandardScaler().fit_transform(X_combined)
+    X_spread = X_combined_norm[:, 0:1]
+    X_bci = X_combined_norm[:, 1:2]
     
     y = df['high_error'].values
     
@@ -131,27 +178,29 @@ def baseline_comparison(bci_data_file):
     print("-" * 60)
     
     # Model 1: Spread only
-    lr = LogisticRegression(random_state=42, max_iter=1000)
+    lr = make_classifier()
     lr.fit(X_spread, y)
     auc = roc_auc_score(y, lr.predict_proba(X_spread)[:, 1])
     print(f"  Spread only:              AUC = {auc:.3f}")
     results.append({'Model': 'Spread only', 'AUC': auc})
     
     # Model 2: BCI only
-    lr = LogisticRegression(random_state=42, max_iter=1000)
+    lr = make_classifier()
     lr.fit(X_bci, y)
     auc = roc_auc_score(y, lr.predict_proba(X_bci)[:, 1])
     print(f"  BCI only:                 AUC = {auc:.3f}")
     results.append({'Model': 'BCI only', 'AUC': auc})
     
     # Model 3: Equal weights (normalized)
-    lr = LogisticRegression(random_state=42, max_iter=1000)
+    lr = make_classifier()
     lr.fit(X_combined_norm, y)
     auc = roc_auc_score(y, lr.predict_proba(X_combined_norm)[:, 1])
     print(f"  Spread + BCI (equal):     AUC = {auc:.3f}")
     results.append({'Model': 'Spread + BCI (equal)', 'AUC': auc})
     
     # Model 4: Learned weights
+    # Raw features: liblinear's penalised intercept shifts the published fit,
+    # so keep the default lbfgs solver here
     lr = LogisticRegression(random_state=42, max_iter=1000)
     lr.fit(X_combined, y)
     auc = roc_auc_score(y, lr.predict_proba(X_combined)[:, 1])
@@ -176,5 +225,5 @@ if __name__ == '__main__':
     # Run validation
     df = validate_bci('../results/bci_validation.csv')
     
-    # Run baseline comparison
-    baseline_comparison('../results/bci_validation.csv')
+    # Run baseline comparison on the same data, without re-reading the CSV
+    baseline_comparison(df)